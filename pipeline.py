@@ -4,7 +4,7 @@ pipeline.py — Main Orchestrator
 Entry point that runs the full ELT flow:
 
     INGEST (dlt + GitHub API)
-        → STAGING (DuckDB SQL cleaning)
+        → STAGING (PyArrow compute cleaning)
             → MARTS (Polars incremental aggregation)
 
 Usage::
@@ -13,14 +13,18 @@ Usage::
     python pipeline.py --org python            # fetch Python org repos
     python pipeline.py --lookback-days 30      # wider incremental window
     python pipeline.py --skip-ingest           # re-run transforms only
+    python pipeline.py --skip-staging-write    # keep staged data in memory only
 """
 
 from __future__ import annotations
 
 import argparse
+import importlib
 import os
 import sys
+import threading
 import time
+from collections.abc import Iterator
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -31,13 +35,38 @@ from dotenv import load_dotenv
 BANNER = r"""
  ╔══════════════════════════════════════════════════════════════╗
  ║   Embedded Modern Data Stack — ELT Pipeline                 ║
- ║   dlt → Parquet → DuckDB → Polars  (Zero-Copy Arrow)       ║
+ ║   dlt → Parquet → PyArrow → Polars  (Zero-Copy Arrow)      ║
  ╚══════════════════════════════════════════════════════════════╝
 """
 
 
+# Heavy transform-layer modules (pyarrow, polars) warmed up during ingest
+WARM_IMPORTS = ("transform.staging", "transform.marts")
+
+
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
+def _warm_imports() -> threading.Thread:
+    """Start importing :data:`WARM_IMPORTS` on a background thread.
+
+    Ingest is network-bound, so paying the several-hundred-millisecond
+    pyarrow/polars import cost there is free. Join the thread before the
+    first transform import; a failed warm-up simply re-raises there.
+    """
+
+    def _import_all() -> None:
+        for name in WARM_IMPORTS:
+            importlib.import_module(name)
+
+    thread = threading.Thread(
+        target=_import_all,
+        name="warm-imports",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
 def _phase(label: str) -> None:
     """Print a phase separator."""
     width = 60
@@ -46,6 +75,21 @@ def _phase(label: str) -> None:
     print(f"{'─' * width}")
 
 
+def _walk_parquet(path: str) -> Iterator[os.DirEntry[str]]:
+    """Yield a ``DirEntry`` for every Parquet file under *path*, recursively.
+
+    ``os.scandir`` answers ``is_dir()`` from the directory listing itself
+    and caches ``stat()`` on the entry, so the walk avoids per-file
+    ``Path`` objects and the extra ``stat`` calls of ``Path.rglob``.
+    """
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_parquet(entry.path)
+            elif entry.name.endswith(".parquet"):
+                yield entry
+
+
 def _print_summary() -> None:
     """Print a summary of all Parquet files produced by the pipeline."""
     dirs = [Path("data/raw"), Path("data/staging"), Path("data/marts")]
@@ -54,7 +98,7 @@ def _print_summary() -> None:
     print(f"{'━' * 60}")
 
     for d in dirs:
-        files = list(d.rglob("*.parquet")) if d.exists() else []
+        files = list(_walk_parquet(str(d))) if d.is_dir() else []
         total_bytes = sum(f.stat().st_size for f in files)
         total_mb = total_bytes / (1024 * 1024)
         print(f"  {d!s:<20s}  {len(files):>3} file(s)  {total_mb:>7.2f} MB")
@@ -64,11 +108,21 @@ def _print_summary() -> None:
 
 # ── Main ─────────────────────────────────────────────────────────────────────
 
-def main(org: str, lookback_days: int, skip_ingest: bool) -> None:
-    """Orchestrate the full ELT pipeline."""
+def main(
+    org: str,
+    lookback_days: int,
+    skip_ingest: bool,
+    skip_staging_write: bool = False,
+) -> None:
+    """Orchestrate the full ELT pipeline.
+
+    The staged Arrow table is passed to the marts in-process, so the
+    staging Parquet file is only written for inspection/standalone runs.
+    """
 
     print(BANNER)
     t0 = time.perf_counter()
+    warm = _warm_imports()
 
     # ── 1. INGEST ────────────────────────────────────────────────────────
     if skip_ingest:
@@ -80,16 +134,17 @@ def main(org: str, lookback_days: int, skip_ingest: bool) -> None:
         run_ingest(org=org)
 
     # ── 2. STAGING ───────────────────────────────────────────────────────
-    _phase("🔧 STAGING — DuckDB SQL → data/staging/")
+    warm.join()
+    _phase("🔧 STAGING — Arrow compute → data/staging/")
     from transform.staging import run_staging
 
-    run_staging()
+    staged = run_staging(lookback_days=lookback_days, write_output=not skip_staging_write)
 
     # ── 3. MARTS ─────────────────────────────────────────────────────────
     _phase("📈 MARTS   — Polars aggregation → data/marts/")
     from transform.marts import run_marts
 
-    run_marts(lookback_days=lookback_days)
+    run_marts(lookback_days=lookback_days, arrow_table_in=staged)
 
     # ── Summary ──────────────────────────────────────────────────────────
     elapsed = time.perf_counter() - t0
@@ -122,9 +177,19 @@ def cli() -> None:
         action="store_true",
         help="Skip the ingestion step (useful when re-running transforms only)",
     )
+    parser.add_argument(
+        "--skip-staging-write",
+        action="store_true",
+        help="Hand staged data to the marts in memory without writing data/staging/",
+    )
 
     args = parser.parse_args()
-    main(org=args.org, lookback_days=args.lookback_days, skip_ingest=args.skip_ingest)
+    main(
+        org=args.org,
+        lookback_days=args.lookback_days,
+        skip_ingest=args.skip_ingest,
+        skip_staging_write=args.skip_staging_write,
+    )
 
 
 if __name__ == "__main__":
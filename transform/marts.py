@@ -8,7 +8,12 @@ using Polars:
 * ``repos_per_language`` — repo count and average stars per language.
 * ``daily_activity``     — daily push count with a 7-day rolling average.
 
-**Zero-Copy path**: PyArrow reads Parquet → ``pl.from_arrow()`` (no copy).
+**Lazy scan**: ``pl.scan_parquet()`` builds a LazyFrame, so the lookback
+predicate and column projection are pushed into the Parquet reader and
+rows outside the window are never materialised.
+**Zero-Copy path**: when the pipeline hands over the staged Arrow table
+in-process, ``pl.from_arrow()`` wraps it without copying and the staging
+Parquet file is not read at all.
 **Incremental logic**: Only rows with ``updated_at >= now - lookback_days``
 are processed, following the *Lookback* pattern.
 """
@@ -19,7 +24,7 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import polars as pl
-import pyarrow.parquet as pq
+import pyarrow as pa
 
 # ── Constants ────────────────────────────────────────────────────────────────
 
@@ -27,43 +32,57 @@ DATA_STAGING_DIR = Path("data/staging")
 DATA_MARTS_DIR = Path("data/marts")
 STAGING_INPUT = DATA_STAGING_DIR / "repos.parquet"
 
+# The only staged columns the marts read; wide text columns are never
+# converted to Polars (left on disk, or dropped from the Arrow handoff)
+MART_INPUT_COLUMNS = ["updated_at", "pushed_at", "language", "repo_id", "stars", "forks"]
+
+# Written explicitly so the mart files don't depend on Polars' defaults
+MART_WRITE_OPTIONS: dict[str, object] = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "statistics": True,
+    "row_group_size": 200_000,
+}
+
+US_PER_DAY = 86_400_000_000  # staged timestamps are microsecond precision
 
-# ── Helpers ──────────────────────────────────────────────────────────────────
 
-def _read_staged_arrow() -> pl.DataFrame:
-    """Read the staging Parquet via PyArrow and hand off to Polars (zero-copy)."""
-    arrow_table = pq.read_table(STAGING_INPUT)
-    return pl.from_arrow(arrow_table)  # zero-copy conversion
+# ── Helpers ──────────────────────────────────────────────────────────────────
 
+def _apply_lookback(lf: pl.LazyFrame, lookback_days: int) -> pl.LazyFrame:
+    """Filter the LazyFrame to only contain rows updated within the lookback window.
 
-def _apply_lookback(df: pl.DataFrame, lookback_days: int) -> pl.DataFrame:
-    """Filter the DataFrame to only contain rows updated within the lookback window.
+    The cutoff is cast once to the column's exact dtype (time unit and
+    time zone, or naive), so the comparison runs directly on the backing
+    integers against a broadcast scalar.
 
-    Handles both timezone-aware and timezone-naive ``updated_at`` columns.
+    Keep the predicate a bare ``col >= literal`` comparison: Polars folds
+    the cast literal to a constant and pushes it into the Parquet scan,
+    where row groups whose ``updated_at`` max lies before the cutoff are
+    skipped from footer statistics without being decoded. Wrapping the
+    column in any expression would defeat that pruning.
     """
+    updated_dtype = lf.collect_schema()["updated_at"]
     cutoff = datetime.now(timezone.utc) - timedelta(days=lookback_days)
+    cutoff_lit = pl.lit(cutoff).cast(updated_dtype)
 
-    updated_col = df.schema["updated_at"]
-    if updated_col.time_zone is None:
-        # Column is naive — compare against naive cutoff
-        cutoff = cutoff.replace(tzinfo=None)
-
-    return df.filter(pl.col("updated_at") >= cutoff)
+    return lf.filter(pl.col("updated_at") >= cutoff_lit)
 
 
 # ── Mart: repos_per_language ─────────────────────────────────────────────────
 
-def _build_repos_per_language(df: pl.DataFrame) -> pl.DataFrame:
+def _build_repos_per_language(lf: pl.LazyFrame) -> pl.LazyFrame:
     """Aggregate repo counts and average stars grouped by programming language.
 
-    Returns a DataFrame sorted by repo count descending.
+    Averages are stored unrounded as ``Float32``; round at display time.
+    Returns a LazyFrame sorted by repo count descending.
     """
     return (
-        df.group_by("language")
+        lf.group_by("language")
         .agg(
             pl.col("repo_id").count().alias("repo_count"),
-            pl.col("stars").mean().round(1).alias("avg_stars"),
-            pl.col("forks").mean().round(1).alias("avg_forks"),
+            pl.col("stars").mean().cast(pl.Float32).alias("avg_stars"),
+            pl.col("forks").mean().cast(pl.Float32).alias("avg_forks"),
         )
         .sort("repo_count", descending=True)
     )
@@ -71,24 +90,30 @@ def _build_repos_per_language(df: pl.DataFrame) -> pl.DataFrame:
 
 # ── Mart: daily_activity ─────────────────────────────────────────────────────
 
-def _build_daily_activity(df: pl.DataFrame) -> pl.DataFrame:
+def _build_daily_activity(lf: pl.LazyFrame) -> pl.LazyFrame:
     """Compute daily push counts with a 7-day rolling average.
 
-    Groups by the *date* portion of ``pushed_at`` to count pushes per day,
-    then applies a rolling mean over a 7-day window.
+    Buckets ``pushed_at`` into whole days since the epoch by integer
+    division of its microsecond storage, groups on that ``Int64`` key to
+    count pushes per day, converts only the aggregated keys back to dates,
+    then applies a rolling mean over a 7-day window (unrounded ``Float32``).
     """
     daily = (
-        df.with_columns(pl.col("pushed_at").dt.date().alias("push_date"))
-        .group_by("push_date")
+        lf.with_columns((pl.col("pushed_at").dt.timestamp("us") // US_PER_DAY).alias("push_day"))
+        .group_by("push_day")
         .agg(pl.col("repo_id").count().alias("push_count"))
-        .sort("push_date")
+        .sort("push_day")
+        .select(
+            pl.from_epoch("push_day", time_unit="d").alias("push_date"),
+            "push_count",
+        )
     )
 
     # Rolling 7-day average of daily push counts
     daily = daily.with_columns(
         pl.col("push_count")
-        .rolling_mean(window_size=7, min_periods=1)
-        .round(2)
+        .cast(pl.Float32)
+        .rolling_mean(window_size=7, min_samples=1)
         .alias("rolling_7d_avg")
     )
 
@@ -97,44 +122,61 @@ def _build_daily_activity(df: pl.DataFrame) -> pl.DataFrame:
 
 # ── Runner ───────────────────────────────────────────────────────────────────
 
-def run_marts(lookback_days: int = 7) -> None:
+def run_marts(lookback_days: int = 7, arrow_table_in: pa.Table | None = None) -> None:
     """Run the marts layer.
 
-    1. Read staged data via Arrow (zero-copy into Polars).
+    1. Wrap *arrow_table_in* (zero-copy) when given, otherwise lazily scan
+       the staged Parquet file — projecting only the mart columns.
     2. Apply the lookback filter for incremental processing.
-    3. Build mart aggregations.
+    3. Build mart aggregations and collect them together in one pass.
     4. Write results to ``data/marts/``.
     """
     DATA_MARTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    if not STAGING_INPUT.exists():
+    if arrow_table_in is not None:
+        # Zero-copy: project on the Arrow side, then Arrow → Polars
+        # (rechunk=False keeps the Arrow buffers)
+        lf = pl.from_arrow(arrow_table_in.select(MART_INPUT_COLUMNS), rechunk=False).lazy()
+    elif STAGING_INPUT.exists():
+        # Lazy: nothing is read until a plan is collected
+        lf = pl.scan_parquet(STAGING_INPUT, low_memory=True).select(MART_INPUT_COLUMNS)
+    else:
         print("  ⚠  No staging file found — skipping marts.")
         return
 
-    # Zero-copy: Arrow → Polars
-    df = _read_staged_arrow()
-    print(f"  → Loaded {len(df):,} staged rows")
+    staged_rows = lf.select(pl.len()).collect().item()
+    print(f"  → Loaded {staged_rows:,} staged rows")
 
-    # Incremental: apply lookback window
-    df_recent = _apply_lookback(df, lookback_days)
-    print(f"  → {len(df_recent):,} rows within {lookback_days}-day lookback window")
+    # Incremental: apply lookback window (pushed down into the scan)
+    lf_recent = _apply_lookback(lf, lookback_days)
 
-    if df_recent.is_empty():
+    # ── Build & write marts ──────────────────────────────────────────────
+
+    # One fused collect: the row count and both marts share a single
+    # filtered scan of the staged file instead of re-reading it per mart.
+    recent_count, repos_lang, daily = pl.collect_all(
+        [
+            lf_recent.select(pl.len()),
+            _build_repos_per_language(lf_recent),
+            _build_daily_activity(lf_recent),
+        ],
+        engine="streaming",
+    )
+    recent_rows = recent_count.item()
+    print(f"  → {recent_rows:,} rows within {lookback_days}-day lookback window")
+
+    if recent_rows == 0:
         print("  ⚠  No recent data after lookback filter — skipping marts.")
         return
 
-    # ── Build & write marts ──────────────────────────────────────────────
-
     # 1. Repos per language
-    repos_lang = _build_repos_per_language(df_recent)
     repos_lang_path = DATA_MARTS_DIR / "repos_per_language.parquet"
-    repos_lang.write_parquet(repos_lang_path)
+    repos_lang.write_parquet(repos_lang_path, **MART_WRITE_OPTIONS)
     print(f"  ✓ repos_per_language  → {repos_lang_path}  ({len(repos_lang):,} rows)")
 
     # 2. Daily activity
-    daily = _build_daily_activity(df_recent)
     daily_path = DATA_MARTS_DIR / "daily_activity.parquet"
-    daily.write_parquet(daily_path)
+    daily.write_parquet(daily_path, **MART_WRITE_OPTIONS)
     print(f"  ✓ daily_activity      → {daily_path}  ({len(daily):,} rows)")
 
 
@@ -1,21 +1,34 @@
 """
 transform/staging.py — Staging Layer
 ======================================
-Reads raw Parquet files produced by ingest.py, applies SQL-based cleaning
-and type-casting using DuckDB, and writes the result to
-``data/staging/repos.parquet``.
+Reads raw Parquet files produced by ingest.py as a PyArrow dataset,
+applies cleaning and type-casting with Arrow compute expressions, and
+writes the result to ``data/staging/repos.parquet``.
 
 This mirrors the "staging" models in a dbt project: renaming, casting,
 filtering nulls, and selecting the columns the downstream marts need.
 
-**Zero-Copy path**: DuckDB → Arrow Table → Parquet (via PyArrow).
+**Arrow end-to-end**: the dataset scanner evaluates the projection while
+decoding, so the staged table never leaves the Arrow columnar format —
+no SQL engine, no intermediate copy.
+**In-process handoff**: ``run_staging()`` returns the staged table so the
+pipeline can pass it straight to the marts; the Parquet write is optional.
+**Differential scan**: with a lookback window, the ``updated_at`` predicate
+is pushed into the dataset scan so row groups outside the window are
+skipped using Parquet footer statistics.
 """
 
 from __future__ import annotations
 
+import os
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
 import pyarrow.parquet as pq
 
 # ── Constants ────────────────────────────────────────────────────────────────
@@ -24,62 +37,161 @@ DATA_RAW_DIR = Path("data/raw")
 DATA_STAGING_DIR = Path("data/staging")
 STAGING_OUTPUT = DATA_STAGING_DIR / "repos.parquet"
 
-# ── SQL ──────────────────────────────────────────────────────────────────────
-
-STAGING_SQL_TEMPLATE = """
-SELECT
-    CAST(id        AS BIGINT)       AS repo_id,
-    CAST(name      AS VARCHAR)      AS repo_name,
-    CAST(full_name AS VARCHAR)      AS repo_full_name,
-    COALESCE(CAST(description AS VARCHAR), '') AS description,
-
-    -- Metrics
-    CAST(stargazers_count AS INTEGER) AS stars,
-    CAST(forks_count      AS INTEGER) AS forks,
+# Raw reads: memory-mapped files (no kernel → user buffer copy); the
+# Parquet format already pre-buffers adjacent column chunks by default
+RAW_FILESYSTEM = pafs.LocalFileSystem(use_mmap=True)
+
+# Staged rows are written in fixed-size row groups, in scan order
+STAGING_ROW_GROUP_SIZE = 100_000
+
+# Parallel scan: decode row groups on all cores, one raw file per core in
+# flight, streamed as record batches no larger than one staged row group
+STAGING_SCAN_OPTIONS: dict[str, object] = {
+    "batch_size": STAGING_ROW_GROUP_SIZE,
+    "use_threads": True,
+    "fragment_readahead": max(4, os.cpu_count() or 1),
+}
+
+# ZSTD pages + footer min/max statistics so readers can skip row groups
+STAGING_WRITE_OPTIONS: dict[str, object] = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "data_page_size": 1 << 20,
+    "write_statistics": True,
+}
+
+# ── Projection ───────────────────────────────────────────────────────────────
+
+STAGING_COLUMNS: dict[str, pc.Expression] = {
+    "repo_id": pc.field("id").cast(pa.int64()),
+    "repo_name": pc.field("name").cast(pa.string()),
+    "repo_full_name": pc.field("full_name").cast(pa.string()),
+    "description": pc.coalesce(pc.field("description").cast(pa.string()), pa.scalar("")),
+
+    # Metrics
+    "stars": pc.field("stargazers_count").cast(pa.int32()),
+    "forks": pc.field("forks_count").cast(pa.int32()),
+
+    # Categorisation
+    "language": pc.coalesce(pc.field("language").cast(pa.string()), pa.scalar("Unknown")),
+
+    # Timestamps → naive UTC microseconds
+    "created_at": pc.field("created_at").cast(pa.timestamp("us")),
+    "updated_at": pc.field("updated_at").cast(pa.timestamp("us")),
+    "pushed_at": pc.field("pushed_at").cast(pa.timestamp("us")),
+}
+
+# Actionable rows only: the marts bucket on pushed_at and window on
+# updated_at, so rows missing either are dropped here, once, for every stage
+STAGING_FILTER = (
+    pc.is_valid(pc.field("name"))
+    & pc.is_valid(pc.field("pushed_at"))
+    & pc.is_valid(pc.field("updated_at"))
+)
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+def _raw_dataset(raw_files: list[Path]) -> ds.Dataset:
+    """Open the raw Parquet files as one PyArrow dataset.
+
+    Footer schemas are unified by column name so files written before a
+    dlt schema evolution still line up, with missing columns read as nulls.
+    """
+    schema = pa.unify_schemas(
+        [pq.read_schema(f, memory_map=True) for f in raw_files],
+        promote_options="default",
+    )
+    return ds.dataset(
+        [str(f) for f in raw_files],
+        schema=schema,
+        format="parquet",
+        filesystem=RAW_FILESYSTEM,
+    )
+
+
+def _write_staged(batches: Iterable[pa.RecordBatch], schema: pa.Schema) -> pa.Table:
+    """Stream scanned *batches* into the staging file and return them as a table.
+
+    Batches are buffered only until ``STAGING_ROW_GROUP_SIZE`` rows have
+    arrived; that group is written straight away, so encoding overlaps the
+    scan and the file holds full-size row groups rather than one per batch.
+    The returned table reuses the written groups.
+    """
+    groups: list[pa.Table] = []
+    with pq.ParquetWriter(STAGING_OUTPUT, schema, **STAGING_WRITE_OPTIONS) as writer:
 
-    -- Categorisation
-    COALESCE(CAST(language AS VARCHAR), 'Unknown') AS language,
+        def write_group(group: pa.Table) -> None:
+            writer.write_table(group, row_group_size=STAGING_ROW_GROUP_SIZE)
+            groups.append(group)
 
-    -- Timestamps → proper TIMESTAMP type
-    CAST(created_at AS TIMESTAMP)   AS created_at,
-    CAST(updated_at AS TIMESTAMP)   AS updated_at,
-    CAST(pushed_at  AS TIMESTAMP)   AS pushed_at
+        # Zero-copy buffer: appending batches and slicing off full groups
+        # only moves chunk references, never row data.
+        buffer = schema.empty_table()
+        for batch in batches:
+            buffer = pa.concat_tables([buffer, pa.Table.from_batches([batch], schema=schema)])
+            while buffer.num_rows >= STAGING_ROW_GROUP_SIZE:
+                write_group(buffer.slice(0, STAGING_ROW_GROUP_SIZE))
+                buffer = buffer.slice(STAGING_ROW_GROUP_SIZE)
+        if buffer.num_rows:
+            write_group(buffer)
 
-FROM read_parquet('{raw_glob}', union_by_name = true)
-WHERE name IS NOT NULL
-ORDER BY updated_at DESC
-"""
+    return pa.concat_tables(groups) if groups else schema.empty_table()
 
 
 # ── Runner ───────────────────────────────────────────────────────────────────
 
-def run_staging() -> None:
+def run_staging(
+    lookback_days: int | None = None,
+    write_output: bool = True,
+) -> pa.Table | None:
     """Run the staging transformation.
 
-    1. Glob all raw Parquet files.
-    2. Execute the staging SQL in an in-memory DuckDB instance.
-    3. Fetch the result as an Apache Arrow table (zero-copy).
-    4. Write the Arrow table to ``data/staging/repos.parquet``.
+    1. Open all raw Parquet files as a PyArrow dataset.
+    2. Scan it with the staging projection and null filter, pushing the
+       optional *lookback_days* window down into the Parquet reader.
+    3. Stream the scanned batches into ``data/staging/repos.parquet``
+       (skipped when *write_output* is false).
+
+    With *lookback_days* set, both the returned table and the staging file
+    hold only repos updated within the window, not the whole raw corpus —
+    ``pipeline.py`` passes its ``--lookback-days``, so a later standalone
+    ``run_marts()`` with a wider window still sees only that window. Call
+    with ``lookback_days=None`` to stage everything.
+
+    Returns the staged Arrow table, or ``None`` when there is no raw data.
     """
     DATA_STAGING_DIR.mkdir(parents=True, exist_ok=True)
 
-    raw_glob = str(DATA_RAW_DIR / "**" / "*.parquet").replace("\\", "/")
     raw_files = list(DATA_RAW_DIR.rglob("*.parquet"))
 
     if not raw_files:
         print("  ⚠  No raw Parquet files found — skipping staging.")
-        return
+        return None
 
     print(f"  → Reading {len(raw_files)} raw file(s) …")
 
-    sql = STAGING_SQL_TEMPLATE.format(raw_glob=raw_glob)
-    con = duckdb.connect(database=":memory:")
-    arrow_table = con.execute(sql).fetch_arrow_table()
-    con.close()
-
-    pq.write_table(arrow_table, STAGING_OUTPUT)
-
-    print(f"  ✓ Staged {arrow_table.num_rows:,} rows → {STAGING_OUTPUT}")
+    row_filter = STAGING_FILTER
+    window = ""
+    if lookback_days is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=lookback_days)
+        row_filter = row_filter & (pc.field("updated_at") >= cutoff)
+        window = f" updated in the last {lookback_days} day(s)"
+
+    scanner = _raw_dataset(raw_files).scanner(
+        columns=STAGING_COLUMNS,
+        filter=row_filter,
+        **STAGING_SCAN_OPTIONS,
+    )
+
+    if write_output:
+        arrow_table = _write_staged(scanner.to_batches(), scanner.projected_schema)
+        print(f"  ✓ Staged {arrow_table.num_rows:,} rows{window} → {STAGING_OUTPUT}")
+    else:
+        arrow_table = scanner.to_table()
+        print(f"  ✓ Staged {arrow_table.num_rows:,} rows{window} (in memory only)")
+
+    return arrow_table
 
 
 # ── CLI entry point ──────────────────────────────────────────────────────────